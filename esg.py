@@ -1,26 +1,32 @@
+import numpy as np
 import pandas as pd
+from lxml import html
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from datetime import datetime
 
+# Accrual Date layouts parsed with a fixed format before falling back to inference
+DATE_FORMATS = ('%Y-%m-%d', '%b %d, %Y')
+
 def load_holdings_html(file_path):
     """
     Load holdings from an HTML file containing a table.
     """
     try:
-        tables = pd.read_html(file_path)
+        tables = html.parse(file_path).xpath('//table')
         if len(tables) == 0:
             raise ValueError("No tables found in HTML file.")
-        # Use the first table by default
-        df = tables[0]
-        df.columns = [str(c).strip() for c in df.columns]  # clean column names
+        # Use the first table by default, first row is the header
+        rows = [[cell.text_content().strip() for cell in tr.xpath('./th|./td')]
+                for tr in tables[0].iterfind('.//tr')]
+        df = pd.DataFrame(rows[1:], columns=rows[0])
     except Exception as e:
         raise ValueError(f"Could not read HTML table: {e}")
 
     # Convert numeric columns
     for col in ['Weight (%)', 'Market Value', 'Notional Value', 'Quantity', 'Price', 'FX Rate']:
         if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+            df[col] = pd.to_numeric(df[col].str.replace(',', '', regex=False), errors='coerce')
     return df
 
 def filter_by_date(df, start_date=None, end_date=None):
@@ -28,11 +34,26 @@ def filter_by_date(df, start_date=None, end_date=None):
     Filter DataFrame by 'Accrual Date' column if present.
     """
     if 'Accrual Date' in df.columns:
-        df['Accrual Date'] = pd.to_datetime(df['Accrual Date'], errors='coerce')
+        dates = df['Accrual Date']
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            # Fixed-format fast path when the first real date matches a known layout,
+            # placeholders like '--' have no digits and are skipped
+            sample = next((str(v).strip() for v in dates if pd.notna(v) and any(ch.isdigit() for ch in str(v))), None)
+            fmt = None
+            if sample is not None:
+                for candidate in DATE_FORMATS:
+                    try:
+                        datetime.strptime(sample, candidate)
+                        fmt = candidate
+                        break
+                    except ValueError:
+                        pass
+            dates = pd.to_datetime(dates, format=fmt, errors='coerce')
+        df['Accrual Date'] = dates
         if start_date:
-            df = df[df['Accrual Date'] >= start_date]
+            df = df[df['Accrual Date'] >= np.datetime64(start_date)]
         if end_date:
-            df = df[df['Accrual Date'] <= end_date]
+            df = df[df['Accrual Date'] <= np.datetime64(end_date)]
     return df
 
 def run_gui():
@@ -68,4 +89,3 @@ def run_gui():
 
 if __name__ == "__main__":
     run_gui()
-ø
\ No newline at end of file
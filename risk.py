@@ -1,30 +1,44 @@
 # risk.py
+from concurrent.futures import ThreadPoolExecutor
 import yfinance as yf
 import pandas as pd
 import numpy as np
 
 # default tickers
 tickers = ["AAPL", "NVDA", "TSLA", "MSFT", "GOOG", "AMZN"]
+tickers_obj = yf.Tickers(" ".join(tickers))
 
-def safe_find_key(df, possible_keys):
-    """Return the first matching key from DataFrame index."""
+def index_map(df):
+    """Map each lowercased DataFrame index label to the original label."""
+    return {str(existing).lower(): existing for existing in df.index}
+
+def safe_find_key(df, possible_keys, index_lower=None):
+    """Return the first matching key from DataFrame index, exact matches first."""
+    if index_lower is None:
+        index_lower = index_map(df)
     for key in possible_keys:
-        for existing in df.index:
-            if key.lower() in existing.lower():
+        key = key.lower()
+        if key in index_lower:
+            return index_lower[key]
+        for lowered, existing in index_lower.items():
+            if key in lowered:
                 return existing
     return None
 
-def get_from_df(df, possible_keys):
-    """Get the latest value from any matching key in DataFrame."""
-    key = safe_find_key(df, possible_keys)
-    if key:
-        val = df.loc[key].iloc[0]
-        return float(val) if pd.notna(val) else np.nan
-    return np.nan
+def get_from_df(df, fields):
+    """Get the latest value of each field from its first matching key in DataFrame."""
+    index_lower = index_map(df)
+    keys = {name: safe_find_key(df, possible_keys, index_lower) for name, possible_keys in fields.items()}
+    found = list(dict.fromkeys(k for k in keys.values() if k is not None))
+    latest = df.loc[found].iloc[:, 0] if found else pd.Series(dtype=float)
+    return {name: float(latest[key]) if key is not None and pd.notna(latest[key]) else np.nan
+            for name, key in keys.items()}
 
 def fetch_financials(ticker):
     """Fetch financial data with multiple fallbacks."""
-    t = yf.Ticker(ticker)
+    t = tickers_obj.tickers.get(ticker)
+    if t is None:
+        t = yf.Ticker(ticker)
     try:
         bs = t.balance_sheet
         is_ = t.financials
@@ -40,13 +54,17 @@ def fetch_financials(ticker):
         raise ValueError("No financial data available.")
 
     data = {
-        "total_assets": get_from_df(bs, ["Total Assets"]),
-        "total_liabilities": get_from_df(bs, ["Total Liab", "Total Liabilities Net Minority Interest"]),
-        "current_assets": get_from_df(bs, ["Total Current Assets", "Current Assets"]),
-        "current_liabilities": get_from_df(bs, ["Total Current Liabilities", "Current Liabilities"]),
-        "retained_earnings": get_from_df(bs, ["Retained Earnings"]),
-        "ebit": get_from_df(is_, ["EBIT", "Ebit", "Operating Income"]),
-        "total_revenue": get_from_df(is_, ["Total Revenue", "Revenue"]),
+        **get_from_df(bs, {
+            "total_assets": ["Total Assets"],
+            "total_liabilities": ["Total Liab", "Total Liabilities Net Minority Interest"],
+            "current_assets": ["Total Current Assets", "Current Assets"],
+            "current_liabilities": ["Total Current Liabilities", "Current Liabilities"],
+            "retained_earnings": ["Retained Earnings"],
+        }),
+        **get_from_df(is_, {
+            "ebit": ["EBIT", "Ebit", "Operating Income"],
+            "total_revenue": ["Total Revenue", "Revenue"],
+        }),
         "market_cap": t.info.get("marketCap", np.nan)
     }
 
@@ -99,6 +117,7 @@ def risk_report(ticker):
 
 if __name__ == "__main__":
     print("\n📉 4-Year Bankruptcy Risk Report\n")
-    reports = [risk_report(t) for t in tickers]
+    with ThreadPoolExecutor(max_workers=min(16, len(tickers))) as ex:
+        reports = list(ex.map(risk_report, tickers))
     df = pd.DataFrame(reports)
     print(df.to_string(index=False))
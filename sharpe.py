@@ -1,8 +1,14 @@
+from dataclasses import dataclass
+import logging
+import math
+import sys
 import yfinance as yf
-import pandas as pd
 import numpy as np
+import osqp
 import matplotlib
 import matplotlib.pyplot as plt
+from scipy import sparse
+from scipy.linalg import cho_factor, cho_solve
 from scipy.optimize import minimize
 
 # CLI COLORS
@@ -14,8 +20,26 @@ BLUE = "\033[94m"
 RED = "\033[91m"
 CYAN = "\033[96m"
 
+# status messages; run with --quiet to hide them
+log = logging.getLogger(__name__)
+logging.basicConfig(level=logging.WARNING if "--quiet" in sys.argv else logging.INFO,
+                    format="%(message)s", stream=sys.stdout)
+
+
+@dataclass(slots=True, frozen=True)
+class SimResult:
+    """Simulated portfolios, one row of `weights` per entry of the metric arrays."""
+    volatility: np.ndarray
+    ret: np.ndarray
+    sharpe: np.ndarray
+    weights: np.ndarray
+
+
 isRunning = True
 
+# price data already downloaded this session, keyed by tickers and period
+price_cache = {}
+
 # default tickers
 tickers = ["AAPL", "NVDA", "TSLA", "BTC", "ETH", "MSFT", "GOOG", "AMZN", "ECL", "COHR"]
 
@@ -39,75 +63,191 @@ while isRunning:
     # 1 - fetch price data
     
     def fetch_yahoo_data(tickers, period="2y"):
-        print(f"{BLUE}⬇️  Fetching price data for: {tickers}...{RESET}")
+        key = (tuple(sorted(tickers)), period)
+        if key in price_cache:
+            log.info("%s✅ Using cached price data for: %s.%s", GREEN, tickers, RESET)
+            return price_cache[key]
+        log.info("%s⬇️  Fetching price data for: %s...%s", BLUE, tickers, RESET)
         data = yf.download(tickers, period=period, auto_adjust=True)["Close"]
-        print(f"{GREEN}✅ Data fetch complete. {len(data)} records loaded.{RESET}")
-        return data.dropna()
+        log.info("%s✅ Data fetch complete. %d records loaded.%s", GREEN, len(data), RESET)
+        price_cache[key] = data.dropna()
+        return price_cache[key]
 
-    # 2 - portfolio metrics
-    
-    def compute_portfolio_stats(weights, mean_returns, cov_matrix, risk_free_rate=0.02):
-        weights = np.array(weights)
-        port_return = np.dot(weights, mean_returns)
-        port_vol = np.sqrt(weights.T @ cov_matrix @ weights)
-        sharpe = (port_return - risk_free_rate) / port_vol
-        return port_return, port_vol, sharpe
-
-    # 3 - Random Portfolios
+    # 2 - Random Portfolios
     
-    def simulate_random_portfolios(n_portfolios, mean_returns, cov_matrix, risk_free_rate):
-        results = []
-        weight_records = []
+    def simulate_random_portfolios(n_portfolios, mean_returns, cov_matrix, risk_free_rate, seed=None):
         n_assets = len(mean_returns)
 
-        print(f"{BLUE}🎲 Simulating {n_portfolios} random portfolios...{RESET}")
-        for _ in range(n_portfolios):
-            weights = np.random.random(n_assets)
-            weights /= weights.sum()
-            port_return, port_vol, sharpe = compute_portfolio_stats(weights, mean_returns, cov_matrix, risk_free_rate)
-            results.append([port_vol, port_return, sharpe])
-            weight_records.append(weights)
+        # uniform over the simplex, so weights already sum to 1
+        rng = np.random.default_rng(seed)
+        weights = rng.dirichlet(np.ones(n_assets), size=n_portfolios)
+        port_returns = weights @ np.asarray(mean_returns)
+        port_vols = np.sqrt(np.einsum("ij,jk,ik->i", weights, np.asarray(cov_matrix), weights))
+        sharpe = (port_returns - risk_free_rate) / port_vols
 
-        print(f"{GREEN}✅ Simulation complete.{RESET}")
-        df = pd.DataFrame(results, columns=["volatility", "return", "sharpe"])
-        df["weights"] = weight_records
-        return df
+        return SimResult(volatility=port_vols, ret=port_returns, sharpe=sharpe, weights=weights)
 
-    # 4 - efficient frontier
+    # 3 - efficient frontier
     
+    def unconstrained_frontier(mu, cov, target_returns):
+        # Two-fund theorem: every unconstrained frontier portfolio is the min-variance
+        # portfolio plus a multiple of one fixed direction
+        factor = cho_factor(cov)
+        inv_ones = cho_solve(factor, np.ones(len(mu)))
+        inv_mu = cho_solve(factor, mu)
+        A, B, C = inv_ones.sum(), mu @ inv_ones, mu @ inv_mu
+        D = A * C - B * B
+        if not D > 1e-12 * A * C:
+            raise np.linalg.LinAlgError("Degenerate frontier for these assets.")
+        gmv_weights, gmv_return = inv_ones / A, B / A
+        direction = (A * inv_mu - B * inv_ones) / D
+        weights = gmv_weights + np.outer(target_returns - gmv_return, direction)
+        vols = np.sqrt(1 / A + A * (target_returns - gmv_return) ** 2 / D)
+        # Lagrange multipliers of the budget and return constraints: 2 cov w = l1 + l2 mu
+        lam_ones = 2 * (C - target_returns * B) / D
+        lam_mu = 2 * (target_returns * A - B) / D
+        return weights, vols, lam_ones, lam_mu
+
+    def long_only_frontier_point(mu, cov, r, at_zero):
+        # Active-set solve: pinning assets at zero is the Jagannathan-Ma covariance
+        # shrinkage, so the closed form runs on the remaining free assets. The upper
+        # bound of 1 never binds on its own once weights are >= 0 and sum to 1.
+        at_zero = at_zero.copy()
+        for _ in range(2 * len(mu)):
+            free = ~at_zero
+            if free.sum() == 1:
+                return single_asset_frontier_point(mu, cov, r, at_zero), at_zero
+            if free.sum() < 2:
+                break
+            w_free, vol, lam_ones, lam_mu = unconstrained_frontier(mu[free], cov[np.ix_(free, free)], np.array([r]))
+            w_free = w_free[0]
+            if (w_free < 0).any():
+                at_zero[np.flatnonzero(free)[np.argmin(w_free)]] = True
+                continue
+            w = np.zeros(len(mu))
+            w[free] = w_free
+            # multipliers of the pinned bounds must be non-negative, otherwise release one
+            slack = 2 * cov @ w - lam_ones[0] - lam_mu[0] * mu
+            slack[free] = 0
+            if slack.min() >= -1e-10:
+                return vol[0], at_zero
+            at_zero[np.argmin(slack)] = False
+        raise np.linalg.LinAlgError("Active set did not converge.")
+
+    def single_asset_frontier_point(mu, cov, r, at_zero):
+        # Only one asset left: it is the whole portfolio, so it must earn r exactly
+        i = np.flatnonzero(~at_zero)[0]
+        if not np.isclose(mu[i], r, rtol=1e-9, atol=1e-12):
+            raise np.linalg.LinAlgError("Target return not reachable with one asset.")
+        # pinned multipliers 2 cov_j,i - l1 - l2 mu_j must be >= 0 for some l1, l2 with
+        # 2 cov_i,i = l1 + l2 mu_i, which bounds l2 from both sides
+        gap = 2 * (cov[:, i] - cov[i, i])
+        spread = mu - mu[i]
+        pinned = np.flatnonzero(at_zero)
+        above, below, level = pinned[spread[pinned] > 0], pinned[spread[pinned] < 0], pinned[spread[pinned] == 0]
+        lam_max = (gap[above] / spread[above]).min(initial=np.inf)
+        lam_min = (gap[below] / spread[below]).max(initial=-np.inf)
+        if lam_min > lam_max + 1e-10 or (gap[level] < -1e-10).any():
+            raise np.linalg.LinAlgError("Single-asset portfolio is not optimal.")
+        return math.sqrt(cov[i, i])
+
+    def min_vol_qp(mu, cov, target_returns):
+        # Long-only min-variance QP per target with OSQP: set up once, then only the
+        # return constraint changes and each solve warm-starts from the previous one
+        n = len(mu)
+        P = sparse.triu(cov, format="csc")
+        A = sparse.vstack([np.ones((1, n)), mu.reshape(1, -1), sparse.eye(n)], format="csc")
+        l = np.hstack([1., 0., np.zeros(n)])
+        u = np.hstack([1., 0., np.ones(n)])
+        prob = osqp.OSQP()
+        prob.setup(P, np.zeros(n), A, l, u, eps_abs=1e-10, eps_rel=1e-10, polish=True, verbose=False)
+
+        vols = np.full(len(target_returns), np.nan)
+        for k, r in enumerate(target_returns):
+            l[1] = u[1] = r
+            prob.update(l=l, u=u)
+            result = prob.solve()
+            # status_polish carries over from earlier solves, so a polished result is only
+            # trusted when its weights actually meet the budget, return and box rows
+            w = result.x
+            feasible = (w is not None and np.isfinite(result.info.obj_val) and np.isfinite(w).all()
+                        and abs(w.sum() - 1) < 1e-6 and abs(w @ mu - r) < 1e-6
+                        and w.min() > -1e-6 and w.max() < 1 + 1e-6)
+            if feasible and (result.info.status in ("solved", "solved inaccurate")
+                             or result.info.status_polish == 1):
+                vols[k] = math.sqrt(max(2 * result.info.obj_val, 0))
+        return vols
+
     def efficient_frontier(mean_returns, cov_matrix, target_returns):
-        frontier_vols = []
-        n = len(mean_returns)
-        bounds = tuple((0, 1) for _ in range(n))
+        mu = np.ascontiguousarray(mean_returns, dtype=np.float64)
+        cov = np.ascontiguousarray(cov_matrix, dtype=np.float64)
+        target_returns = np.asarray(target_returns, dtype=np.float64)
+        n = len(mu)
 
-        for r in target_returns:
-            constraints = (
-                {"type": "eq", "fun": lambda w: np.sum(w) - 1},
-                {"type": "eq", "fun": lambda w: np.dot(w, mean_returns) - r}
-            )
-            result = minimize(lambda w, cov: w.T @ cov @ w, n*[1./n],
-                              args=(cov_matrix,), bounds=bounds, constraints=constraints)
-            frontier_vols.append(np.sqrt(result.fun) if result.success else np.nan)
+        try:
+            weights, frontier_vols, _, _ = unconstrained_frontier(mu, cov, target_returns)
+            bounds_bind = (weights < 0).any(axis=1)
+        except np.linalg.LinAlgError:
+            frontier_vols = np.full(len(target_returns), np.nan)
+            bounds_bind = np.ones(len(target_returns), dtype=bool)
+
+        # Targets where the long-only bounds bind: warm-start from the neighbouring target's
+        # active set, then from scratch, a QP solver for whatever is left
+        at_zero = np.zeros(n, dtype=bool)
+        unsolved = []
+        for i in np.flatnonzero(bounds_bind):
+            r = target_returns[i]
+            if not mu.min() <= r <= mu.max():
+                frontier_vols[i] = np.nan
+                continue
+            for start in (at_zero, np.zeros(n, dtype=bool)):
+                try:
+                    frontier_vols[i], at_zero = long_only_frontier_point(mu, cov, r, start)
+                    break
+                except np.linalg.LinAlgError:
+                    pass
+            else:
+                unsolved.append(i)
+
+        if unsolved:
+            frontier_vols[unsolved] = min_vol_qp(mu, cov, target_returns[unsolved])
         return frontier_vols
 
-    # 5 - Max Sharpe Portfolio
+    # 4 - Max Sharpe Portfolio
     
     def max_sharpe_portfolio(mean_returns, cov_matrix, risk_free_rate):
-        n = len(mean_returns)
+        mu = np.ascontiguousarray(mean_returns, dtype=np.float64)
+        cov = np.ascontiguousarray(cov_matrix, dtype=np.float64)
+        n = len(mu)
+        last = {}
         def neg_sharpe(w):
-            return -compute_portfolio_stats(w, mean_returns, cov_matrix, risk_free_rate)[2]
+            port_return = w @ mu
+            port_vol = math.sqrt(w @ cov @ w)
+            last.update(w=w.copy(), port_return=port_return, port_vol=port_vol)
+            return -(port_return - risk_free_rate) / port_vol
+        def grad_neg_sharpe(w):
+            cov_w = cov @ w
+            port_vol = math.sqrt(w @ cov_w)
+            port_return = w @ mu
+            return -mu / port_vol + (port_return - risk_free_rate) / port_vol**3 * cov_w
         constraints = {"type": "eq", "fun": lambda w: np.sum(w) - 1}
         bounds = tuple((0, 1) for _ in range(n))
-        return minimize(neg_sharpe, n*[1./n], bounds=bounds, constraints=constraints)
+        result = minimize(neg_sharpe, n*[1./n], jac=grad_neg_sharpe, bounds=bounds, constraints=constraints)
+
+        # reuse the last objective evaluation when SLSQP stopped on it
+        if not np.array_equal(last["w"], result.x):
+            neg_sharpe(result.x)
+        result.port_return, result.port_vol = last["port_return"], last["port_vol"]
+        return result
 
-    # 6. plot function
+    # 5. plot function
     
-    def plot_results(results_df, frontier_returns, frontier_vols, best_portfolio, tickers):
+    def plot_results(sim, frontier_returns, frontier_vols, best_portfolio, tickers):
         plt.figure(figsize=(8, 7))
 
         # Scatter random portfolios
-        scatter = plt.scatter(results_df["volatility"], results_df["return"],
-                              c=results_df["sharpe"], cmap="viridis", alpha=0.5)
+        scatter = plt.scatter(sim.volatility, sim.ret,
+                              c=sim.sharpe, cmap="viridis", alpha=0.5)
 
         # Plot efficient frontier
         plt.plot(frontier_vols, frontier_returns, 'r--', linewidth=2, label="Efficient Frontier")
@@ -151,19 +291,20 @@ while isRunning:
         mean_returns = log_returns.mean() * 252
         cov_matrix = log_returns.cov() * 252
 
-        results_df = simulate_random_portfolios(1000000, mean_returns, cov_matrix, risk_free_rate)
+        sim = simulate_random_portfolios(1000000, mean_returns, cov_matrix, risk_free_rate)
 
-        print(f"{BLUE}🔎 Finding max Sharpe ratio portfolio...{RESET}")
+        log.info("%s🔎 Finding max Sharpe ratio portfolio...%s", BLUE, RESET)
         max_sharpe = max_sharpe_portfolio(mean_returns, cov_matrix, risk_free_rate)
         best_weights = max_sharpe.x
-        best_return, best_vol, best_sharpe = compute_portfolio_stats(best_weights, mean_returns, cov_matrix, risk_free_rate)
+        best_return, best_vol = max_sharpe.port_return, max_sharpe.port_vol
+        best_sharpe = (best_return - risk_free_rate) / best_vol
         best_portfolio = {"weights": best_weights, "return": best_return, "volatility": best_vol, "sharpe": best_sharpe}
 
-        frontier_returns = np.linspace(results_df["return"].min(), results_df["return"].max(), 100)
+        frontier_returns = np.linspace(sim.ret.min(), sim.ret.max(), 100)
         frontier_vols = efficient_frontier(mean_returns, cov_matrix, frontier_returns)
 
         print(f"{GREEN}✅ Max Sharpe Portfolio found! Sharpe={best_sharpe:.2f}{RESET}")
         for t, w in zip(tickers, best_weights):
             print(f"{t}: {w:.2%}")
 
-        plot_results(results_df, frontier_returns, frontier_vols, best_portfolio, tickers)
+        plot_results(sim, frontier_returns, frontier_vols, best_portfolio, tickers)
@@ -1,7 +1,10 @@
+from dataclasses import dataclass
+import logging
+import sys
 import yfinance as yf
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from numba import njit
 from scipy.optimize import minimize
 
 # CLI COLORS
@@ -13,29 +16,81 @@ BLUE = "\033[94m"
 RED = "\033[91m"
 CYAN = "\033[96m"
 
+# status messages; run with --quiet to hide them
+log = logging.getLogger(__name__)
+logging.basicConfig(level=logging.WARNING if "--quiet" in sys.argv else logging.INFO,
+                    format="%(message)s", stream=sys.stdout)
+
+
+@dataclass(slots=True, frozen=True)
+class SimResult:
+    """Simulated portfolios, one row of `weights` per entry of the metric arrays."""
+    volatility: np.ndarray
+    ret: np.ndarray
+    sortino: np.ndarray
+    weights: np.ndarray
+
+
+# Sortino kernel
+
+@njit(cache=True, fastmath=True)
+def _sortino_kernel(weights, returns, mean_returns, cov_matrix, day_returns):
+    # Single pass over the daily returns, no boolean-mask temporaries;
+    # the portfolio's daily returns are written to day_returns for the gradient
+    n_days, n_assets = returns.shape
+    portfolio_return = 0.0
+    portfolio_var = 0.0
+    for i in range(n_assets):
+        portfolio_return += weights[i] * mean_returns[i]
+        for j in range(n_assets):
+            portfolio_var += weights[i] * cov_matrix[i, j] * weights[j]
+
+    sumsq = 0.0
+    n_down = 0
+    for t in range(n_days):
+        day_return = 0.0
+        for i in range(n_assets):
+            day_return += returns[t, i] * weights[i]
+        day_returns[t] = day_return
+        if day_return < 0:
+            sumsq += day_return * day_return
+            n_down += 1
+    downside_std = np.sqrt(sumsq / max(n_down, 1)) * np.sqrt(252.0)
+    return portfolio_return, np.sqrt(portfolio_var), downside_std
+
+
 isRunning = True
+
+# price data already downloaded this session, keyed by tickers and date range
+price_cache = {}
+
 tickers = ["AAPL", "NVDA", "TSLA", "BTC", "ETH", "MSFT", "GOOG", "AMZN"]
 
 while isRunning:
     # 1. Data Fetching
     
     def fetch_yahoo_data(tickers, start=None, end=None):
-        print(f"{BLUE}⬇️  Fetching price data for: {tickers}...{RESET}")
+        key = (tuple(sorted(tickers)), start, end)
+        if key in price_cache:
+            log.info("%s✅ Using cached price data for: %s.%s", GREEN, tickers, RESET)
+            return price_cache[key]
+        log.info("%s⬇️  Fetching price data for: %s...%s", BLUE, tickers, RESET)
         data = yf.download(tickers, start=start, end=end, auto_adjust=True)["Close"]
-        print(f"{GREEN}✅ Data fetch complete. {len(data)} records loaded.{RESET}")
-        return data.dropna()
+        log.info("%s✅ Data fetch complete. %d records loaded.%s", GREEN, len(data), RESET)
+        price_cache[key] = data.dropna()
+        return price_cache[key]
 
     # 2. Portfolio Statistics
     
     def compute_portfolio_stats(weights, mean_returns, cov_matrix, returns, risk_free_rate=0.02):
-        weights = np.array(weights)
         portfolio_return = np.dot(weights, mean_returns)
         portfolio_vol = np.sqrt(weights.T @ cov_matrix @ weights)
 
         # Calculate downside deviation
         portfolio_returns = returns @ weights
-        downside_returns = portfolio_returns[portfolio_returns < 0]
-        downside_std = np.std(downside_returns) * np.sqrt(252)
+        downside_returns = np.minimum(portfolio_returns, 0.0)
+        n_down = np.count_nonzero(downside_returns)
+        downside_std = np.sqrt(downside_returns @ downside_returns / max(n_down, 1)) * np.sqrt(252)
 
         # Sortino Ratio
         sortino = (portfolio_return - risk_free_rate) / downside_std if downside_std > 0 else 0
@@ -43,42 +98,66 @@ while isRunning:
 
     # 3. Random Portfolio Simulation
     
-    def simulate_random_portfolios(n_portfolios, mean_returns, cov_matrix, returns, risk_free_rate):
-        results = []
-        weight_records = []
+    def simulate_random_portfolios(n_portfolios, mean_returns, cov_matrix, returns, risk_free_rate, chunk_size=10000, seed=None):
         n_assets = len(mean_returns)
 
-        print(f"{BLUE}🎲 Simulating {n_portfolios} random portfolios...{RESET}")
-        for _ in range(n_portfolios):
-            weights = np.random.random(n_assets)
-            weights /= weights.sum()
-            port_return, port_vol, sortino = compute_portfolio_stats(weights, mean_returns, cov_matrix, returns, risk_free_rate)
-            results.append([port_vol, port_return, sortino])
-            weight_records.append(weights)
+        log.info("%s🎲 Simulating %d random portfolios...%s", BLUE, n_portfolios, RESET)
+        # uniform over the simplex, so weights already sum to 1
+        rng = np.random.default_rng(seed)
+        weights = rng.dirichlet(np.ones(n_assets), size=n_portfolios)
+        port_returns = weights @ mean_returns
+        port_vols = np.sqrt(np.einsum("ij,jk,ik->i", weights, cov_matrix, weights))
 
-        print(f"{GREEN}✅ Simulation complete.{RESET}")
-        df = pd.DataFrame(results, columns=["volatility", "return", "sortino"])
-        df["weights"] = weight_records
-        return df
+        # Downside deviation, chunked so the (days x portfolios) return matrix stays small
+        downside_std = np.empty(n_portfolios)
+        for start in range(0, n_portfolios, chunk_size):
+            port_returns_ts = returns @ weights[start:start + chunk_size].T
+            downside = np.minimum(port_returns_ts, 0.0)
+            n_down = np.maximum((port_returns_ts < 0).sum(axis=0), 1)
+            downside_std[start:start + chunk_size] = np.sqrt((downside * downside).sum(axis=0) / n_down) * np.sqrt(252)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sortino = np.where(downside_std > 0, (port_returns - risk_free_rate) / downside_std, 0)
+
+        log.info("%s✅ Simulation complete.%s", GREEN, RESET)
+        return SimResult(volatility=port_vols, ret=port_returns, sortino=sortino, weights=weights)
 
     # 4. Max Sortino Portfolio
     
     def max_sortino_portfolio(mean_returns, cov_matrix, returns, risk_free_rate):
         n = len(mean_returns)
+        day_returns = np.empty(len(returns))
+        last = {}
         def neg_sortino(weights):
-            return -compute_portfolio_stats(weights, mean_returns, cov_matrix, returns, risk_free_rate)[2]
+            portfolio_return, _, downside_std = _sortino_kernel(weights, returns, mean_returns, cov_matrix, day_returns)
+            last.update(weights=weights.copy(), portfolio_return=portfolio_return, downside_std=downside_std)
+            if downside_std == 0:
+                return 0
+            return -(portfolio_return - risk_free_rate) / downside_std
+
+        def grad_neg_sortino(weights):
+            # reuse the daily returns of the objective call at the same point
+            if not np.array_equal(last.get("weights"), weights):
+                neg_sortino(weights)
+            portfolio_return, downside_std = last["portfolio_return"], last["downside_std"]
+            if downside_std == 0:
+                return np.zeros(n)
+            downside_returns = np.minimum(day_returns, 0.0)
+            n_down = np.count_nonzero(downside_returns)
+            grad_downside = 252 * (returns.T @ downside_returns) / (n_down * downside_std)
+            return -mean_returns / downside_std + (portfolio_return - risk_free_rate) / downside_std**2 * grad_downside
 
         constraints = {"type": "eq", "fun": lambda w: np.sum(w) - 1}
         bounds = tuple((0, 1) for _ in range(n))
-        return minimize(neg_sortino, n*[1./n], bounds=bounds, constraints=constraints)
+        return minimize(neg_sortino, n*[1./n], jac=grad_neg_sortino, bounds=bounds, constraints=constraints)
 
     # 5. Plot Results
     
-    def plot_results(results_df, best_portfolio, tickers):
+    def plot_results(sim, best_portfolio, tickers):
         plt.figure(figsize=(8, 7))
 
-        scatter = plt.scatter(results_df["volatility"], results_df["return"],
-                            c=results_df["sortino"], cmap="plasma", alpha=0.5)
+        scatter = plt.scatter(sim.volatility, sim.ret,
+                            c=sim.sortino, cmap="plasma", alpha=0.5)
 
         plt.scatter(best_portfolio["volatility"], best_portfolio["return"],
                     marker="*", color="red", s=300, label="Max Sortino Portfolio")
@@ -126,19 +205,22 @@ while isRunning:
 
         price_data = fetch_yahoo_data(tickers, start=start, end=end)
         log_returns = np.log(price_data / price_data.shift(1)).dropna()
-        mean_returns = log_returns.mean() * 252
-        cov_matrix = log_returns.cov() * 252
 
-        results_df = simulate_random_portfolios(800000, mean_returns, cov_matrix, log_returns, risk_free_rate)
+        # plain float64 arrays from here on, so every product below is a BLAS call
+        returns = np.ascontiguousarray(log_returns.values, dtype=np.float64)
+        mean_returns = returns.mean(axis=0) * 252
+        cov_matrix = np.cov(returns, rowvar=False) * 252
+
+        sim = simulate_random_portfolios(800000, mean_returns, cov_matrix, returns, risk_free_rate)
 
-        print(f"{BLUE}🔎 Finding max Sortino ratio portfolio...{RESET}")
-        max_sortino = max_sortino_portfolio(mean_returns, cov_matrix, log_returns, risk_free_rate)
+        log.info("%s🔎 Finding max Sortino ratio portfolio...%s", BLUE, RESET)
+        max_sortino = max_sortino_portfolio(mean_returns, cov_matrix, returns, risk_free_rate)
         best_weights = max_sortino.x
-        best_return, best_vol, best_sortino = compute_portfolio_stats(best_weights, mean_returns, cov_matrix, log_returns, risk_free_rate)
+        best_return, best_vol, best_sortino = compute_portfolio_stats(best_weights, mean_returns, cov_matrix, returns, risk_free_rate)
         best_portfolio = {"weights": best_weights, "return": best_return, "volatility": best_vol, "sortino": best_sortino}
 
         print(f"{GREEN}✅ Max Sortino Portfolio found! Sortino={best_sortino:.2f}{RESET}")
         for t, w in zip(tickers, best_weights):
             print(f"{t}: {w:.2%}")
 
-        plot_results(results_df, best_portfolio, tickers)
+        plot_results(sim, best_portfolio, tickers)